@@ -1,9 +1,89 @@
 # auth_service.py - Supabase Authentication
 import os
+import asyncio
+import hashlib
+import logging
+import time
 from typing import Optional, Dict
 from supabase import create_client, Client
+from cachetools import TLRUCache, TTLCache
+import httpx
 import jwt
-from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# How long a verified access token is trusted without asking Supabase again
+TOKEN_CACHE_TTL_SECONDS = 30
+
+# How long a rejected email/password pair is answered locally
+SIGNIN_FAILURE_TTL_SECONDS = 10
+
+# Access token lifetime (Supabase Auth > JWT expiry); bounds how long a
+# signed-out token or a pre-rename token can still be presented
+SUPABASE_JWT_EXPIRY_SECONDS = int(os.getenv("SUPABASE_JWT_EXPIRY", 3600))
+
+# Connection pool for the Auth REST client; lower SUPABASE_MAX_CONNECTIONS
+# to stay inside the project's connection quota on small plans
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 100))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", 50))
+
+INVALID_LOGIN_MESSAGE = "Invalid email or password"
+
+# Error classification: Supabase error_code first, then substring fallbacks
+# for responses without one (checked in order against the lowercased message)
+_SIGNUP_ERROR_CODES = {
+    "user_already_exists": "Email already registered",
+    "email_exists": "Email already registered",
+    "email_address_invalid": "Invalid email format",
+    "weak_password": "Password must be at least 6 characters",
+}
+_SIGNUP_ERROR_TABLE = (
+    ("already registered", "Email already registered"),
+    ("invalid email", "Invalid email format"),
+    ("password", "Password must be at least 6 characters"),
+)
+_SIGNIN_ERROR_CODES = {
+    "invalid_credentials": INVALID_LOGIN_MESSAGE,
+}
+_SIGNIN_ERROR_TABLE = (
+    ("invalid", INVALID_LOGIN_MESSAGE),
+    ("credentials", INVALID_LOGIN_MESSAGE),
+)
+
+
+def _classify_error(error: Exception, codes: Dict, table: tuple, default: str) -> str:
+    """
+    Map an auth error to a user-facing message
+    
+    Args:
+        error: Exception raised by the SDK or the REST client
+        codes: Supabase error_code -> message
+        table: (substring, message) pairs tried in order
+        default: Message when nothing matches
+        
+    Returns:
+        User-facing error message
+    """
+    message = codes.get(getattr(error, "code", None))
+    if message:
+        return message
+    
+    error_lower = str(error).lower()
+    for needle, message in table:
+        if needle in error_lower:
+            return message
+    
+    return default
+
+
+class AuthAPIError(Exception):
+    """Error response from the Supabase Auth REST API"""
+    
+    def __init__(self, message: str, status_code: int, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
 
 class AuthService:
     """Handles user authentication with Supabase"""
@@ -14,13 +94,54 @@ class AuthService:
         supabase_key = os.getenv("SUPABASE_KEY")
         
         if not supabase_url or not supabase_key:
-            print("⚠️  SUPABASE credentials not set - authentication disabled")
+            logger.warning("⚠️  SUPABASE credentials not set - authentication disabled")
             self.supabase: Optional[Client] = None
+            self._http: Optional[httpx.AsyncClient] = None
             self.enabled = False
         else:
             self.supabase = create_client(supabase_url, supabase_key)
+            # Hot paths (sign in, refresh, token lookup) talk to the Auth REST
+            # API directly over one pooled HTTP/2 client (closed in aclose)
+            self._http = httpx.AsyncClient(
+                base_url=f"{supabase_url.rstrip('/')}/auth/v1",
+                headers={
+                    "apikey": supabase_key,
+                    "Content-Type": "application/json"
+                },
+                timeout=10.0,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=min(SUPABASE_MAX_KEEPALIVE, SUPABASE_MAX_CONNECTIONS)
+                )
+            )
             self.enabled = True
-            print("✅ Supabase authentication initialized")
+            logger.info("✅ Supabase authentication initialized")
+        
+        # Project JWT secret (Settings > API); enables local token verification
+        self.jwt_secret = os.getenv("SUPABASE_JWT_SECRET")
+        
+        # sha256(access_token) -> (user dict, expires_at timestamp)
+        self._token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+        
+        # sha256(access_token) -> (True, expires_at) for signed-out tokens; kept
+        # until the token's own exp (capped at the JWT lifetime), since its
+        # signature stays valid until then
+        self._revoked_tokens = TLRUCache(
+            maxsize=100_000, ttu=lambda _key, value, _now: value[1], timer=time.time
+        )
+        
+        # user id -> (name, expires_at) for renamed users; tokens issued before
+        # the rename still carry the old name in their user_metadata claim
+        self._profile_names = TLRUCache(
+            maxsize=10000, ttu=lambda _key, value, _now: value[1], timer=time.time
+        )
+        
+        # sha256(email|password) -> error dict for recently rejected sign-ins
+        self._signin_failures = TTLCache(maxsize=5000, ttl=SIGNIN_FAILURE_TTL_SECONDS)
+        
+        # sha256(refresh_token) -> in-flight refresh shared by concurrent callers
+        self._refreshes: Dict[bytes, asyncio.Future] = {}
     
     async def sign_up(self, email: str, password: str, name: str) -> Dict:
         """
@@ -47,14 +168,13 @@ class AuthService:
                 "password": password,
                 "options": {
                     "data": {
-                        "name": name,
-                        "created_at": datetime.now().isoformat()
+                        "name": name
                     }
                 }
             })
             
             if response.user:
-                print(f"✅ New user registered: {email}")
+                logger.info("✅ New user registered: %s", email)
                 return {
                     "status": "success",
                     "user": {
@@ -75,30 +195,18 @@ class AuthService:
                 }
         
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Sign up error: {error_msg}")
+            logger.error("❌ Sign up error: %s", e)
             
             # Handle common errors
-            if "already registered" in error_msg.lower():
-                return {
-                    "status": "error",
-                    "error": "Email already registered"
-                }
-            elif "invalid email" in error_msg.lower():
-                return {
-                    "status": "error",
-                    "error": "Invalid email format"
-                }
-            elif "password" in error_msg.lower():
-                return {
-                    "status": "error",
-                    "error": "Password must be at least 6 characters"
-                }
-            else:
-                return {
-                    "status": "error",
-                    "error": "Registration failed. Please try again."
-                }
+            return {
+                "status": "error",
+                "error": _classify_error(
+                    e,
+                    _SIGNUP_ERROR_CODES,
+                    _SIGNUP_ERROR_TABLE,
+                    "Registration failed. Please try again."
+                )
+            }
     
     async def sign_in(self, email: str, password: str) -> Dict:
         """
@@ -117,32 +225,36 @@ class AuthService:
                 "error": "Authentication not configured"
             }
         
+        # Replay a recent rejection of the same credentials without asking Supabase
+        failure_key = hashlib.sha256(f"{email}|{password}".encode()).digest()
+        cached_failure = self._signin_failures.get(failure_key)
+        if cached_failure is not None:
+            return cached_failure
+        
         try:
             # Sign in with Supabase
-            response = self.supabase.auth.sign_in_with_password({
-                "email": email,
-                "password": password
-            })
+            session = await self._auth_request(
+                "POST",
+                "/token",
+                params={"grant_type": "password"},
+                json={"email": email, "password": password}
+            )
+            user = session.get("user")
             
-            if response.user:
+            if user:
                 # Get user metadata
-                user_metadata = response.user.user_metadata or {}
-                name = user_metadata.get("name", email.split("@")[0])
+                name = self._display_name(user.get("user_metadata"), email)
                 
-                print(f"✅ User signed in: {email}")
+                logger.info("✅ User signed in: %s", email)
                 
                 return {
                     "status": "success",
                     "user": {
-                        "id": response.user.id,
-                        "email": response.user.email,
+                        "id": user["id"],
+                        "email": user.get("email"),
                         "name": name
                     },
-                    "session": {
-                        "access_token": response.session.access_token,
-                        "refresh_token": response.session.refresh_token,
-                        "expires_at": response.session.expires_at
-                    },
+                    "session": self._session_payload(session),
                     "message": "Signed in successfully!"
                 }
             else:
@@ -152,19 +264,21 @@ class AuthService:
                 }
         
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Sign in error: {error_msg}")
+            logger.error("❌ Sign in error: %s", e)
             
-            if "invalid" in error_msg.lower() or "credentials" in error_msg.lower():
-                return {
-                    "status": "error",
-                    "error": "Invalid email or password"
-                }
-            else:
-                return {
-                    "status": "error",
-                    "error": "Sign in failed. Please try again."
-                }
+            failure = {
+                "status": "error",
+                "error": _classify_error(
+                    e,
+                    _SIGNIN_ERROR_CODES,
+                    _SIGNIN_ERROR_TABLE,
+                    "Sign in failed. Please try again."
+                )
+            }
+            # Only credential rejections are cached; transient failures retry
+            if failure["error"] == INVALID_LOGIN_MESSAGE:
+                self._signin_failures[failure_key] = failure
+            return failure
     
     async def sign_out(self, access_token: str) -> Dict:
         """
@@ -182,14 +296,39 @@ class AuthService:
                 "error": "Authentication not configured"
             }
         
+        # The token must stop verifying (cache or local JWT check) after logout
+        cache_key = hashlib.sha256(access_token.encode()).digest()
+        self._token_cache.pop(cache_key, None)
+        
+        # A token with a valid signature is revoked up front, so it stays out
+        # even if Supabase can't be reached; anything else only once /logout
+        # accepts it (junk tokens must not crowd out real revocations)
+        revoked = False
+        if self.jwt_secret:
+            try:
+                claims = jwt.decode(
+                    access_token,
+                    self.jwt_secret,
+                    algorithms=["HS256"],
+                    audience="authenticated"
+                )
+                self._revoke_token(cache_key, claims.get("exp"))
+                revoked = True
+            except jwt.InvalidTokenError:
+                pass
+        
         try:
-            # Set the session
-            self.supabase.auth.set_session(access_token, access_token)
+            # Revoke the session with the caller's bearer token in one request
+            await self._auth_request(
+                "POST",
+                "/logout",
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
             
-            # Sign out
-            self.supabase.auth.sign_out()
+            if not revoked:
+                self._revoke_token(cache_key, self._token_exp(access_token))
             
-            print(f"✅ User signed out")
+            logger.info("✅ User signed out")
             
             return {
                 "status": "success",
@@ -197,7 +336,7 @@ class AuthService:
             }
         
         except Exception as e:
-            print(f"❌ Sign out error: {e}")
+            logger.error("❌ Sign out error: %s", e)
             return {
                 "status": "error",
                 "error": "Sign out failed"
@@ -216,26 +355,144 @@ class AuthService:
         if not self.enabled:
             return None
         
+        cache_key = hashlib.sha256(access_token.encode()).digest()
+        if cache_key in self._revoked_tokens:
+            return None
+        
+        # Serve repeat verifications from the cache (never past the token's exp)
+        cached = self._token_cache.get(cache_key)
+        if cached is not None:
+            user, expires_at = cached
+            if time.time() < expires_at:
+                return user
+            self._token_cache.pop(cache_key, None)
+        
+        # Supabase access tokens are HS256 JWTs; check them without a round-trip
+        if self.jwt_secret:
+            try:
+                claims = jwt.decode(
+                    access_token,
+                    self.jwt_secret,
+                    algorithms=["HS256"],
+                    audience="authenticated"
+                )
+            except jwt.ExpiredSignatureError:
+                return None
+            except jwt.InvalidTokenError:
+                # e.g. a project on asymmetric signing keys - let Supabase decide
+                claims = None
+            
+            if claims:
+                email = claims.get("email", "")
+                renamed = self._profile_names.get(claims["sub"])
+                user = {
+                    "id": claims["sub"],
+                    "email": email,
+                    "name": renamed[0] if renamed else self._display_name(claims.get("user_metadata"), email)
+                }
+                self._cache_token(cache_key, user, claims.get("exp"))
+                return user
+        
         try:
             # Get user from token
-            response = self.supabase.auth.get_user(access_token)
+            response = await self._auth_request(
+                "GET",
+                "/user",
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
             
-            if response.user:
-                user_metadata = response.user.user_metadata or {}
-                name = user_metadata.get("name", response.user.email.split("@")[0])
+            if response.get("id"):
+                email = response.get("email")
+                name = self._display_name(response.get("user_metadata"), email)
                 
-                return {
-                    "id": response.user.id,
-                    "email": response.user.email,
+                user = {
+                    "id": response["id"],
+                    "email": email,
                     "name": name
                 }
+                self._cache_token(cache_key, user, self._token_exp(access_token))
+                return user
             else:
                 return None
         
         except Exception as e:
-            print(f"❌ Token verification error: {e}")
+            logger.error("❌ Token verification error: %s", e)
+            return None
+    
+    async def _auth_request(self, method: str, path: str, **kwargs) -> Dict:
+        """
+        Call the Supabase Auth REST API over the shared client
+        
+        Args:
+            method: HTTP method
+            path: Path under /auth/v1 (e.g. "/token")
+            **kwargs: Passed through to httpx (params, json, headers)
+            
+        Returns:
+            Decoded JSON body
+            
+        Raises:
+            AuthAPIError: On a non-2xx response
+        """
+        response = await self._http.request(method, path, **kwargs)
+        body = response.json() if response.content else {}
+        
+        if response.is_error:
+            message = (
+                body.get("msg")
+                or body.get("error_description")
+                or body.get("message")
+                or f"HTTP {response.status_code}"
+            )
+            raise AuthAPIError(message, response.status_code, body.get("error_code"))
+        
+        return body
+    
+    @staticmethod
+    def _session_payload(session: Dict) -> Dict:
+        """Client-facing session fields from an Auth /token response"""
+        expires_at = session.get("expires_at")
+        if expires_at is None and session.get("expires_in") is not None:
+            expires_at = int(time.time()) + session["expires_in"]
+        
+        return {
+            "access_token": session["access_token"],
+            "refresh_token": session["refresh_token"],
+            "expires_at": expires_at
+        }
+    
+    @staticmethod
+    def _display_name(user_metadata: Optional[Dict], email: Optional[str]) -> str:
+        """Profile name, falling back to the local part of the email"""
+        if user_metadata:
+            name = user_metadata.get("name")
+            if name is not None:
+                return name
+        return (email or "").partition("@")[0]
+    
+    def _token_exp(self, access_token: str) -> Optional[float]:
+        """Read the exp claim of a token Supabase has already verified"""
+        try:
+            claims = jwt.decode(access_token, options={"verify_signature": False})
+            return claims.get("exp")
+        except jwt.InvalidTokenError:
             return None
     
+    def _revoke_token(self, cache_key: bytes, exp: Optional[float]):
+        """Refuse a signed-out token until its exp, capped at the JWT lifetime"""
+        expires_at = time.time() + SUPABASE_JWT_EXPIRY_SECONDS
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        self._revoked_tokens[cache_key] = (True, expires_at)
+    
+    def _cache_token(self, cache_key: bytes, user: Dict, exp: Optional[float]):
+        """Cache a verified token until the TTL or its own exp, whichever is sooner"""
+        if exp is None:
+            return
+        
+        expires_at = min(time.time() + TOKEN_CACHE_TTL_SECONDS, float(exp))
+        self._token_cache[cache_key] = (user, expires_at)
+    
     async def refresh_session(self, refresh_token: str) -> Dict:
         """
         Refresh access token using refresh token
@@ -252,17 +509,32 @@ class AuthService:
                 "error": "Authentication not configured"
             }
         
+        # Refresh tokens are single-use: concurrent refreshes of the same token
+        # (e.g. several tabs waking up) share one request instead of racing
+        key = hashlib.sha256(refresh_token.encode()).digest()
+        refresh = self._refreshes.get(key)
+        if refresh is None:
+            refresh = asyncio.ensure_future(self._refresh_session(refresh_token))
+            self._refreshes[key] = refresh
+            refresh.add_done_callback(lambda _: self._refreshes.pop(key, None))
+        
+        # Shielded so one caller disconnecting doesn't cancel it for the others
+        return await asyncio.shield(refresh)
+    
+    async def _refresh_session(self, refresh_token: str) -> Dict:
+        """Exchange a refresh token for a new session (one request per token)"""
         try:
-            response = self.supabase.auth.refresh_session(refresh_token)
+            session = await self._auth_request(
+                "POST",
+                "/token",
+                params={"grant_type": "refresh_token"},
+                json={"refresh_token": refresh_token}
+            )
             
-            if response.session:
+            if session.get("access_token"):
                 return {
                     "status": "success",
-                    "session": {
-                        "access_token": response.session.access_token,
-                        "refresh_token": response.session.refresh_token,
-                        "expires_at": response.session.expires_at
-                    }
+                    "session": self._session_payload(session)
                 }
             else:
                 return {
@@ -271,7 +543,7 @@ class AuthService:
                 }
         
         except Exception as e:
-            print(f"❌ Token refresh error: {e}")
+            logger.error("❌ Token refresh error: %s", e)
             return {
                 "status": "error",
                 "error": "Session expired. Please sign in again."
@@ -295,18 +567,32 @@ class AuthService:
             }
         
         try:
-            # Set the session
-            self.supabase.auth.set_session(access_token, access_token)
+            # Update user metadata with the caller's bearer token in one request
+            user = await self._auth_request(
+                "PUT",
+                "/user",
+                headers={"Authorization": f"Bearer {access_token}"},
+                json={"data": {"name": name}}
+            )
             
-            # Update user metadata
-            response = self.supabase.auth.update_user({
-                "data": {
-                    "name": name
+            if user.get("id"):
+                email = user.get("email")
+                user_data = {
+                    "id": user["id"],
+                    "email": email,
+                    "name": self._display_name(user.get("user_metadata"), email)
                 }
-            })
-            
-            if response.user:
-                print(f"✅ Profile updated for user")
+                # The caller's cached identity and any token minted before now
+                # (whose claims still carry the old name) see the new name
+                self._cache_token(
+                    hashlib.sha256(access_token.encode()).digest(),
+                    user_data,
+                    self._token_exp(access_token)
+                )
+                self._profile_names[user["id"]] = (
+                    user_data["name"], time.time() + SUPABASE_JWT_EXPIRY_SECONDS
+                )
+                logger.info("✅ Profile updated for user")
                 return {
                     "status": "success",
                     "message": "Profile updated successfully"
@@ -318,7 +604,7 @@ class AuthService:
                 }
         
         except Exception as e:
-            print(f"❌ Profile update error: {e}")
+            logger.error("❌ Profile update error: %s", e)
             return {
                 "status": "error",
                 "error": "Failed to update profile"
@@ -349,9 +635,14 @@ class AuthService:
             }
         
         except Exception as e:
-            print(f"❌ Password reset request error: {e}")
+            logger.error("❌ Password reset request error: %s", e)
             # Don't reveal if email exists
             return {
                 "status": "success",
                 "message": "If that email exists, a reset link was sent."
-            }
\ No newline at end of file
+            }
+    
+    async def aclose(self):
+        """Close the pooled Auth HTTP client (call on shutdown)"""
+        if self._http is not None:
+            await self._http.aclose()
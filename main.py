@@ -1,28 +1,38 @@
 # main.py - Real-Time Translation Backend with Daily.co Video
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request # Added Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Depends # Added Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles # Added for CSS
 from fastapi.templating import Jinja2Templates # Added for HTML
-from fastapi.responses import HTMLResponse # Added for response type
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response # Added for response type
 from pydantic import BaseModel
 import os
-from typing import Optional
-import json
-import requests
+import asyncio
+import logging
+import queue
+import secrets
+from logging.handlers import QueueHandler, QueueListener
+from typing import Awaitable, Callable, List, Optional
+import httpx
+import orjson
 
 # Import your services
-from room_manager import RoomManager
+from room_manager import RoomManager, ConversationRoom, Participant, resolve_codec, send_json_fast, receive_json_fast
 from translation_pipeline import TranslationPipeline
 from auth_service import AuthService
 from rate_limiter import RateLimiter
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+logger = logging.getLogger(__name__)
+
 # ========================================
 # FastAPI App Initialization
 # ========================================
 app = FastAPI(
     title="Real-Time Translation API with Video",
     description="Bidirectional real-time translation with video call support",
-    version="2.1"
+    version="2.1",
+    # orjson writes UTF-8 directly, which matters for non-Latin translations
+    default_response_class=ORJSONResponse
 )
 
 # 1. Mount the static folder (where your style.css lives)
@@ -41,14 +51,14 @@ app.add_middleware(
         "http://localhost:3000",
         "http://localhost:8000",
         "http://127.0.0.1:8000",
-        "https://*.github.io",
-        "https://railway.app",
-        "https://holysmokas.github.io/translation-server",
-        "*"
+        "https://translation-server-production-d487.up.railway.app",
+        "https://holysmokas.github.io",
     ],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+    # Let browsers cache preflight responses for a day
+    max_age=86400,
 )
 
 # ========================================
@@ -64,6 +74,9 @@ async def get_index(request: Request):
 room_manager = RoomManager()
 translation_pipeline = TranslationPipeline()
 
+# Max concurrent pipeline calls a single connection's fan-out may have in flight
+MAX_INFLIGHT_TRANSLATIONS = int(os.getenv("MAX_INFLIGHT", 4))
+
 # Daily.co Configuration
 DAILY_API_KEY = os.getenv("DAILY_API_KEY")
 DAILY_API_BASE = "https://api.daily.co/v1"
@@ -129,7 +142,20 @@ async def reset_password(request: ResetPasswordRequest):
 # Daily.co Helper Functions
 # ========================================
 
-def create_daily_room(room_code: str) -> Optional[str]:
+# One pooled async client so Daily.co calls reuse connections and never
+# block the event loop (closed in shutdown_event)
+daily_client = httpx.AsyncClient(
+    base_url=DAILY_API_BASE,
+    headers={
+        "Authorization": f"Bearer {DAILY_API_KEY}",
+        "Content-Type": "application/json"
+    },
+    timeout=10.0,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+async def create_daily_room(room_code: str) -> Optional[str]:
     """
     Create a Daily.co video room
     
@@ -140,15 +166,10 @@ def create_daily_room(room_code: str) -> Optional[str]:
         Daily.co room URL or None if failed
     """
     if not DAILY_API_KEY:
-        print("⚠️  DAILY_API_KEY not set - video disabled")
+        logger.warning("⚠️  DAILY_API_KEY not set - video disabled")
         return None
     
     try:
-        headers = {
-            "Authorization": f"Bearer {DAILY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         # Create room with custom name
         payload = {
             "name": f"translator-{room_code.lower()}",
@@ -163,79 +184,131 @@ def create_daily_room(room_code: str) -> Optional[str]:
             }
         }
         
-        response = requests.post(
-            f"{DAILY_API_BASE}/rooms",
-            headers=headers,
-            json=payload,
-            timeout=10
-        )
+        response = await daily_client.post("/rooms", json=payload)
         
         if response.status_code == 200:
             data = response.json()
             video_url = data.get("url")
-            print(f"✅ Created Daily.co room: {video_url}")
+            logger.info("✅ Created Daily.co room: %s", video_url)
             return video_url
         else:
-            print(f"❌ Daily.co room creation failed: {response.status_code}")
-            print(f"   Response: {response.text}")
+            logger.error(
+                "❌ Daily.co room creation failed: %s\n   Response: %s",
+                response.status_code, response.text
+            )
             return None
             
     except Exception as e:
-        print(f"❌ Error creating Daily.co room: {e}")
+        logger.error("❌ Error creating Daily.co room: %s", e)
+        return None
+
+async def get_daily_room_url(room_code: str) -> Optional[str]:
+    """
+    Look up the URL of an existing Daily.co video room
+    
+    Args:
+        room_code: Unique room identifier
+        
+    Returns:
+        Daily.co room URL or None if unavailable
+    """
+    if not DAILY_API_KEY:
         return None
+    
+    try:
+        room_name = f"translator-{room_code.lower()}"
+        response = await daily_client.get(f"/rooms/{room_name}")
+        if response.status_code == 200:
+            video_url = response.json().get("url")
+            logger.info("✅ Got video URL: %s", video_url)
+            return video_url
+    except Exception as e:
+        logger.error("❌ Error fetching video URL: %s", e)
+    
+    return None
 
-def delete_daily_room(room_code: str):
+async def get_room_video_url(room: ConversationRoom) -> Optional[str]:
+    """
+    Get a room's video URL, asking Daily.co only if it isn't known yet
+    
+    Args:
+        room: Conversation room
+        
+    Returns:
+        Daily.co room URL or None if unavailable
+    """
+    if room.video_url is None:
+        room.video_url = await get_daily_room_url(room.room_code)
+    return room.video_url
+
+async def delete_daily_room(room_code: str):
     """Delete a Daily.co video room"""
     if not DAILY_API_KEY:
         return
     
     try:
-        headers = {
-            "Authorization": f"Bearer {DAILY_API_KEY}"
-        }
-        
         room_name = f"translator-{room_code.lower()}"
         
-        requests.delete(
-            f"{DAILY_API_BASE}/rooms/{room_name}",
-            headers=headers,
-            timeout=10
-        )
+        await daily_client.delete(f"/rooms/{room_name}")
         
-        print(f"🗑️  Deleted Daily.co room: {room_name}")
+        logger.info("🗑️  Deleted Daily.co room: %s", room_name)
         
     except Exception as e:
-        print(f"❌ Error deleting Daily.co room: {e}")
+        logger.error("❌ Error deleting Daily.co room: %s", e)
 
 # ========================================
 # HTTP Endpoints
 # ========================================
 
-@app.get("/")
-async def root():
-    """Health check endpoint"""
-    return {
-        "status": "online",
-        "service": "Real-Time Translation API with Video",
-        "version": "2.1",
-        "mode": "bidirectional",
-        "video_enabled": bool(DAILY_API_KEY),
-        "endpoints": {
-            "create_room": "POST /api/room/create",
-            "join_room": "POST /api/room/join/{room_code}",
-            "websocket": "WS /ws/{room_code}/{user_id}",
-            "stats": "GET /api/stats"
-        }
+# Static payloads, serialized once at import
+ROOT_BYTES = orjson.dumps({
+    "status": "online",
+    "service": "Real-Time Translation API with Video",
+    "version": "2.1",
+    "mode": "bidirectional",
+    "video_enabled": bool(DAILY_API_KEY),
+    "endpoints": {
+        "status": "GET /api",
+        "health": "GET /health",
+        "create_room": "POST /api/room/create",
+        "join_room": "POST /api/room/join/{room_code}",
+        "websocket": "WS /ws/{room_code}/{user_id}",
+        "stats": "GET /api/stats"
     }
+})
+HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "translation-api",
+    "video_enabled": bool(DAILY_API_KEY)
+})
+LANGUAGE_INFO = translation_pipeline.get_supported_languages()
+LANGUAGES_BYTES = orjson.dumps(LANGUAGE_INFO)
+
+@app.get("/api")
+async def root():
+    """Service status and endpoint list (GET / serves the app page)"""
+    return Response(content=ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health():
     """Health check for Railway"""
-    return {
-        "status": "healthy",
-        "service": "translation-api",
-        "video_enabled": bool(DAILY_API_KEY)
-    }
+    return Response(content=HEALTH_BYTES, media_type="application/json")
+
+def normalize_room(room_code: str) -> str:
+    """Uppercase the room code path parameter once per request"""
+    return room_code.upper()
+
+# Bearer token for operator-only endpoints (unset = those endpoints don't exist)
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
+
+def require_admin(request: Request):
+    """Allow only requests bearing ADMIN_API_TOKEN; 404 when it isn't configured"""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, ADMIN_API_TOKEN):
+        raise HTTPException(status_code=401, detail="Admin token required")
 
 @app.post("/api/room/create", response_model=RoomResponse)
 async def create_room():
@@ -246,7 +319,9 @@ async def create_room():
     room = room_manager.create_room()
     
     # Create Daily.co video room
-    video_url = create_daily_room(room.room_code)
+    video_url = await create_daily_room(room.room_code)
+    # Remembered on the room so joins don't have to look it up again
+    room.video_url = video_url
     
     return RoomResponse(
         room_code=room.room_code,
@@ -256,15 +331,15 @@ async def create_room():
 
 @app.post("/api/room/join/{room_code}", response_model=JoinRoomResponse)
 async def join_room(
-    room_code: str,
     user_name: str,
-    language: str
+    language: str,
+    room_code: str = Depends(normalize_room)
 ):
     """
     Join an existing room with video support
     """
     # Validate room exists
-    room = room_manager.get_room(room_code.upper())
+    room = room_manager.get_room(room_code)
     
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -276,30 +351,14 @@ async def join_room(
             detail=f"Language '{language}' is not supported"
         )
     
-    # Generate user ID
-    import random
-    import string
-    user_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    # Generate user ID (8 URL-safe chars from one os.urandom call)
+    user_id = secrets.token_urlsafe(6)
     
-    # Get REAL video URL from Daily.co API
-    video_url = None
-    if DAILY_API_KEY:
-        try:
-            headers = {"Authorization": f"Bearer {DAILY_API_KEY}"}
-            room_name = f"translator-{room_code.lower()}"
-            response = requests.get(
-                f"{DAILY_API_BASE}/rooms/{room_name}",
-                headers=headers,
-                timeout=10
-            )
-            if response.status_code == 200:
-                video_url = response.json().get("url")
-                print(f"✅ Got real video URL: {video_url}")
-        except Exception as e:
-            print(f"❌ Error fetching video URL: {e}")
+    # Get REAL video URL (stored at creation, Daily.co API as a fallback)
+    video_url = await get_room_video_url(room)
     
     return JoinRoomResponse(
-        room_code=room_code.upper(),
+        room_code=room_code,
         user_id=user_id,
         message=f"Ready to join room {room_code}",
         video_url=video_url
@@ -309,26 +368,34 @@ async def join_room(
 async def get_stats():
     """Get statistics about active rooms and translations"""
     stats = room_manager.get_stats()
-    language_info = translation_pipeline.get_supported_languages()
     
     return {
         "rooms": stats,
-        "translation": language_info,
+        "translation": LANGUAGE_INFO,
+        "translation_cache": translation_pipeline.get_cache_stats(),
         "video_enabled": bool(DAILY_API_KEY)
     }
 
+@app.get("/api/stats/rooms", dependencies=[Depends(require_admin)])
+async def get_room_stats():
+    """
+    Get per-room participant details (admin only)
+    
+    Lists live room codes and participant names and walks every room, so
+    it needs ADMIN_API_TOKEN and stays off the public /api/stats.
+    """
+    return {"rooms": room_manager.get_room_details()}
+
 @app.get("/api/languages")
 async def get_languages():
     """Get list of supported languages"""
-    return translation_pipeline.get_supported_languages()
+    return Response(content=LANGUAGES_BYTES, media_type="application/json")
 
 @app.delete("/api/room/{room_code}")
-async def close_room(room_code: str):
+async def close_room(room_code: str = Depends(normalize_room)):
     """Close a room and delete associated Daily.co room"""
-    room_code = room_code.upper()
-    
     # Delete Daily.co room
-    delete_daily_room(room_code)
+    await delete_daily_room(room_code)
     
     # Close room in manager
     room_manager.close_room(room_code)
@@ -339,6 +406,127 @@ async def close_room(room_code: str):
 # WebSocket Endpoint
 # ========================================
 
+# Background TTS jobs, referenced until they finish
+audio_tasks: set = set()
+
+async def send_translated_audio(
+    listeners: List[Participant],
+    sender_name: str,
+    original_text: str,
+    translated_text: str,
+    language: str
+):
+    """
+    Synthesize a translation and send it as a follow-up "audio" frame
+    
+    Args:
+        listeners: Participants who want audio for this translation
+        sender_name: Display name of the original speaker
+        original_text: Text as sent
+        translated_text: Text to speak
+        language: Language of translated_text
+    """
+    # Raw bytes; room_manager base64-encodes only for JSON clients
+    audio_bytes = await translation_pipeline.synthesize_audio(translated_text, language)
+    if not audio_bytes:
+        return
+    
+    await room_manager.send_to_participants(listeners, {
+        "type": "audio",
+        "sender": sender_name,
+        "original_text": original_text,
+        "translated_text": translated_text,
+        "translated_audio": audio_bytes,
+        "your_language": language
+    })
+
+async def handle_text_message(
+    room: ConversationRoom,
+    sender: Participant,
+    message_data: dict,
+    translate: Callable[[str, str, str], Awaitable[dict]]
+):
+    """
+    Text message - translate and send to all participants
+    
+    Args:
+        room: Sender's room
+        sender: Participant who sent the message
+        message_data: Decoded client message
+        translate: The connection's bounded (text, source, target) translator
+    """
+    original_text = message_data.get("text", "")
+    
+    # Ignore empty messages
+    if not original_text or original_text.isspace():
+        return
+    
+    # Get translation targets
+    targets = room.get_translation_targets(sender.user_id)
+    
+    # Send confirmation to sender
+    await room_manager.send_to_participants([sender], {
+        "type": "sent",
+        "original_text": original_text,
+        "recipients": len(targets)
+    })
+    
+    if len(targets) == 1:
+        # Two-person room (the common case): one listener and one pair, so
+        # skip the grouping and the gather machinery
+        participant, source_lang, target_lang = targets[0]
+        pairs = [(source_lang, target_lang)]
+        recipients = {pairs[0]: [participant]}
+        try:
+            results = [await translate(original_text, source_lang, target_lang)]
+        except Exception as e:
+            results = [e]
+    else:
+        # Group listeners by language pair so each pair is translated once
+        recipients = {}
+        for participant, source_lang, target_lang in targets:
+            recipients.setdefault((source_lang, target_lang), []).append(participant)
+        pairs = list(recipients)
+        
+        # Translate every pair concurrently (bounded by the connection's inflight limit)
+        results = await asyncio.gather(
+            *(
+                translate(original_text, source_lang, target_lang)
+                for source_lang, target_lang in pairs
+            ),
+            return_exceptions=True
+        )
+    
+    # Send each group the translation for their language right away;
+    # speech follows in a separate "audio" frame so text isn't held up by TTS
+    for (source_lang, target_lang), result in zip(pairs, results):
+        if not (isinstance(result, dict) and result["status"] == "success"):
+            continue
+        
+        group = recipients[(source_lang, target_lang)]
+        await room_manager.send_to_participants(group, {
+            "type": "translation",
+            "sender": sender.user_name,
+            "sender_language": source_lang,
+            "original_text": original_text,
+            "translated_text": result["translated_text"],
+            "your_language": target_lang
+        })
+        
+        # Same-language listeners already read the original; skip their audio
+        listeners = [p for p in group if p.wants_audio]
+        if listeners and source_lang != target_lang and translation_pipeline.tts_enabled:
+            task = asyncio.create_task(send_translated_audio(
+                listeners, sender.user_name, original_text, result["translated_text"], target_lang
+            ))
+            audio_tasks.add(task)
+            task.add_done_callback(audio_tasks.discard)
+
+# Client message type -> handler(room, sender, message_data, translate)
+MESSAGE_HANDLERS = {
+    "text": handle_text_message,
+}
+
 @app.websocket("/ws/{room_code}/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, room_code: str, user_id: str):
     """
@@ -350,11 +538,12 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str, user_id: str)
     """
     await websocket.accept()
     
+    # Normalized once here; everything below uses the uppercased code
     room_code = room_code.upper()
     room = room_manager.get_room(room_code)
     
     if not room:
-        await websocket.send_json({
+        await send_json_fast(websocket, {
             "type": "error",
             "message": "Room not found"
         })
@@ -364,15 +553,38 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str, user_id: str)
     # User info (will be set on join message)
     user_name = None
     user_language = None
+    sender = None
+    
+    # Caps this connection's translation fan-out so one sender in a
+    # many-language room can't flood the translator
+    inflight = asyncio.Semaphore(MAX_INFLIGHT_TRANSLATIONS)
+    
+    async def translate_limited(text: str, source_lang: str, target_lang: str):
+        # Same-language listeners get the original text as-is, with no
+        # pipeline call (and no TTS) and no inflight slot taken
+        if source_lang == target_lang:
+            return {
+                "status": "success",
+                "translated_text": text
+            }
+        async with inflight:
+            return await translation_pipeline.translate_text(
+                text=text,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
     
     try:
         # Wait for join message
-        data = await websocket.receive_text()
-        join_data = json.loads(data)
+        join_data = await receive_json_fast(websocket)
         
         if join_data.get("type") == "join":
             user_name = join_data.get("user_name", "Guest")
             user_language = join_data.get("language", "en")
+            # Clients may ask for msgpack frames; the bundled app uses JSON
+            codec = resolve_codec(join_data.get("codec"))
+            # Text-only clients skip speech synthesis entirely
+            wants_audio = join_data.get("audio", True) is not False
             
             # Add participant to room
             room_manager.add_participant(
@@ -380,33 +592,24 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str, user_id: str)
                 user_id=user_id,
                 user_name=user_name,
                 language=user_language,
-                websocket=websocket
+                websocket=websocket,
+                codec=codec,
+                wants_audio=wants_audio
             )
+            # Bound once; the sender is stable for the life of this socket
+            sender = room.get_participant(user_id)
             
             # Get video URL
-            video_url = None
-            if DAILY_API_KEY:
-                try:
-                    headers = {"Authorization": f"Bearer {DAILY_API_KEY}"}
-                    room_name = f"translator-{room_code.lower()}"
-                    response = requests.get(
-                    f"{DAILY_API_BASE}/rooms/{room_name}",
-                    headers=headers,
-                    timeout=10
-        )
-                    if response.status_code == 200:
-                        video_url = response.json().get("url")
-                        print(f"✅ Got video URL for WebSocket: {video_url}")
-
-                except Exception as e:
-                    print(f"❌ Error fetching video URL in WebSocket: {e}")
+            video_url = await get_room_video_url(room)
             
-            # Send welcome message to user
-            await websocket.send_json({
+            # Send welcome message to user (via their outbox, so one task
+            # owns every write to this socket)
+            await room_manager.send_to_participants([sender], {
                 "type": "system",
                 "message": f"Welcome {user_name}! You joined room {room_code}",
                 "your_language": user_language,
-                "video_url": video_url
+                "video_url": video_url,
+                "codec": codec
             })
             
             # Notify others
@@ -421,100 +624,103 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str, user_id: str)
         
         # Main message loop
         while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = await receive_json_fast(websocket)
+            
+            # Room was closed (cleanup or DELETE) while this socket was open
+            if not room.is_active:
+                break
             
-            message_type = message_data.get("type")
+            # Ignore unknown message types and sockets that never joined
+            handler = MESSAGE_HANDLERS.get(message_data.get("type"))
+            if handler is None or sender is None:
+                continue
             
-            if message_type == "text":
-                # Text message - translate and send to all participants
-                original_text = message_data.get("text", "")
-                
-                if not original_text.strip():
-                    continue
-                
-                # Get translation targets
-                targets = room.get_translation_targets(user_id)
-                
-                # Send confirmation to sender
-                await websocket.send_json({
-                    "type": "sent",
-                    "original_text": original_text,
-                    "recipients": len(targets)
-                })
-                
-                # Translate and send to each participant
-                for participant, source_lang, target_lang in targets:
-                    # Translate text
-                    result = await translation_pipeline.process_text(
-                        text=original_text,
-                        source_lang=source_lang,
-                        target_lang=target_lang
-                    )
-                    
-                    if result["status"] == "success":
-                        # Send translated message
-                        await room_manager.send_to_user(
-                            room_code=room_code,
-                            user_id=participant.user_id,
-                            message={
-                                "type": "translation",
-                                "sender": user_name,
-                                "sender_language": source_lang,
-                                "original_text": original_text,
-                                "translated_text": result["translated_text"],
-                                "translated_audio": result.get("translated_audio", ""),
-                                "your_language": target_lang
-                            }
-                        )
+            await handler(room, sender, message_data, translate_limited)
     
     except WebSocketDisconnect:
-        print(f"❌ User {user_id} disconnected")
+        logger.info("❌ User %s disconnected", user_id)
     
     except Exception as e:
-        print(f"❌ WebSocket error for user {user_id}: {e}")
+        logger.error("❌ WebSocket error for user %s: %s", user_id, e)
     
     finally:
-        # Remove participant from room
-        if user_name:
-            room_manager.remove_participant(room_code, user_id)
-        
-            # Notify others
-            await room_manager.broadcast_to_room(
-                room_code=room_code,
-                message={
-                    "type": "system",
-                    "message": f"{user_name} left the conversation"
-                }
-        )
-        
-        # Don't delete Daily.co room immediately - let it stay for others to join
-        # Daily.co rooms auto-expire after 10 minutes of inactivity
+        # Remove participant from room (unless a rejoin with this user_id
+        # already replaced this socket's participant)
+        if sender is not None and room.participants.get(user_id) is sender:
+            remaining = room_manager.remove_participant(room_code, user_id)
+            
+            if remaining:
+                # Notify others
+                await room_manager.broadcast_to_room(
+                    room_code=room_code,
+                    message={
+                        "type": "system",
+                        "message": f"{user_name} left the conversation"
+                    }
+                )
             
             # If room is empty, delete Daily.co room
-            if len(room.participants) == 0:
-                delete_daily_room(room_code)
+            elif remaining == 0:
+                await delete_daily_room(room_code)
 
 # ========================================
 # Startup/Shutdown Events
 # ========================================
 
+# How often expired rooms are pruned
+ROOM_CLEANUP_INTERVAL_SECONDS = 60
+
+async def room_cleanup_loop():
+    """Periodically close expired and abandoned rooms"""
+    while True:
+        await asyncio.sleep(ROOM_CLEANUP_INTERVAL_SECONDS)
+        try:
+            for room_code in room_manager.cleanup_inactive_rooms():
+                await delete_daily_room(room_code)
+        except Exception as e:
+            logger.error("❌ Room cleanup failed: %s", e)
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
-    print("=" * 50)
-    print("🚀 Real-Time Translation API Starting...")
-    print("=" * 50)
-    print(f"✅ Translation Pipeline: Initialized")
-    print(f"✅ Room Manager: Ready")
-    print(f"✅ Supported Languages: {len(translation_pipeline.get_supported_languages()['languages'])}")
-    print(f"{'✅' if DAILY_API_KEY else '⚠️ '} Daily.co Video: {'Enabled' if DAILY_API_KEY else 'Disabled (set DAILY_API_KEY to enable)'}")
-    print("=" * 50)
+    # Hand log records to a background thread so handler I/O never blocks the loop
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    app.state.log_listener = QueueListener(
+        log_queue, *root_logger.handlers, respect_handler_level=True
+    )
+    root_logger.handlers = [QueueHandler(log_queue)]
+    app.state.log_listener.start()
+    
+    app.state.room_cleanup_task = asyncio.create_task(room_cleanup_loop())
+    # In the background, so startup (and health checks) don't wait on Azure
+    app.state.warmup_task = asyncio.create_task(translation_pipeline.warmup())
+    
+    logger.info("=" * 50)
+    logger.info("🚀 Real-Time Translation API Starting...")
+    logger.info("=" * 50)
+    logger.info("✅ Translation Pipeline: Initialized")
+    logger.info("✅ Room Manager: Ready")
+    logger.info("✅ Supported Languages: %s", LANGUAGE_INFO['total_languages'])
+    logger.info(
+        "%s Daily.co Video: %s",
+        '✅' if DAILY_API_KEY else '⚠️ ',
+        'Enabled' if DAILY_API_KEY else 'Disabled (set DAILY_API_KEY to enable)'
+    )
+    logger.info("=" * 50)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
-    print("👋 Shutting down Real-Time Translation API...")
+    app.state.room_cleanup_task.cancel()
+    app.state.warmup_task.cancel()
+    await daily_client.aclose()
+    await auth_service.aclose()
+    await translation_pipeline.aclose()
+    
+    logger.info("👋 Shutting down Real-Time Translation API...")
+    # Flushes whatever is still queued
+    app.state.log_listener.stop()
 
 # ========================================
 # For Railway: Port binding
@@ -522,9 +728,29 @@ async def shutdown_event():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
+    # Rooms live in this process's memory, so extra workers are only safe
+    # behind a proxy that pins each room code to one worker (sticky routing).
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    ws_max_size = int(os.environ.get("WS_MAX_SIZE", 1024 * 1024))
+    # Room for connection bursts; optional cap on concurrent connections
+    backlog = int(os.environ.get("BACKLOG", 2048))
+    limit_concurrency = os.environ.get("LIMIT_CONCURRENCY")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        # websockets' permessage-deflate keeps the compression context across
+        # frames (context takeover, 15-bit window), so the repeated JSON keys
+        # of later translation frames cost almost nothing
+        ws="websockets",
+        # Compress frames on the wire; recovers much of the base64 overhead on TTS audio
+        ws_per_message_deflate=True,
+        # Inbound frames are small chat messages; cap them at 1 MiB
+        ws_max_size=ws_max_size,
+        backlog=backlog,
+        limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
         log_level="info"
     )
\ No newline at end of file
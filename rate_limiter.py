@@ -1,9 +1,46 @@
 # rate_limiter.py - Protect Against Cost Overruns
-from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import Optional, Dict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Dict
+from cachetools import Cache, TTLCache
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+
+def _current_day() -> int:
+    """Days since the Unix epoch (UTC); daily limits reset when this changes"""
+    return int(time.time() // SECONDS_PER_DAY)
+
+
+def _day_start_iso(day: int) -> str:
+    """ISO timestamp of midnight UTC at the start of a day bucket"""
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc).isoformat()
+
+
+class DefaultTTLCache(TTLCache):
+    """TTLCache that creates missing entries on first access, like defaultdict"""
+    
+    def __init__(self, maxsize: int, ttl: float, default_factory: Callable[[], Dict]):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.default_factory = default_factory
+    
+    def __missing__(self, key):
+        value = self.default_factory()
+        self[key] = value
+        return value
+    
+    def expire(self, time=None) -> int:
+        """Remove expired items and return how many were removed"""
+        # Cache.__len__ counts stored items without expiring them first
+        before = Cache.__len__(self)
+        super().expire(time)
+        return before - Cache.__len__(self)
+
+
 class RateLimiter:
     """
     Rate limiter to enforce usage limits and prevent cost abuse
@@ -16,23 +53,25 @@ class RateLimiter:
     """
     
     def __init__(self):
-        # Store usage data
+        # Store usage data for the current UTC day only; entries never expire
+        # or get evicted mid-day (that would zero counters and hand out a fresh
+        # quota), and the whole map is replaced when the day rolls over
         # Key: user_id or session_id
-        # Value: {translations: int, video_minutes: int, last_reset: datetime}
-        self.usage_data = defaultdict(lambda: {
-            'translations': 0,
-            'video_minutes': 0,
-            'last_reset': datetime.now(),
-            'first_seen': datetime.now()
-        })
+        # Value: {translations: int, video_minutes: int, reset_day: int, first_seen: float}
+        self._usage_day = _current_day()
+        self.usage_data = defaultdict(self._new_usage)
         
-        # Session data for guests (no auth)
+        # Session data for guests (no auth); a session expires with its entry
         # Key: session_id
-        # Value: {messages: int, created_at: datetime}
-        self.guest_sessions = defaultdict(lambda: {
-            'messages': 0,
-            'created_at': datetime.now()
-        })
+        # Value: {messages: int, created_at: float}
+        self.guest_sessions = DefaultTTLCache(
+            maxsize=50_000,
+            ttl=30 * 60,
+            default_factory=lambda: {
+                'messages': 0,
+                'created_at': time.time()
+            }
+        )
         
         # User tier limits
         self.LIMITS = {
@@ -53,6 +92,28 @@ class RateLimiter:
             }
         }
     
+    def _new_usage(self) -> Dict:
+        """Zeroed usage entry for the current day"""
+        return {
+            'translations': 0,
+            'video_minutes': 0,
+            'reset_day': self._usage_day,
+            'first_seen': time.time()
+        }
+    
+    def _roll_day(self):
+        """Start a fresh usage map at midnight UTC (every old entry counts a past day)"""
+        today = _current_day()
+        if today != self._usage_day:
+            self._usage_day = today
+            self.usage_data = defaultdict(self._new_usage)
+    
+    def _daily_usage(self, user_id: str) -> Dict:
+        """Get a user's usage entry for the current (UTC) day"""
+        # Reset daily at midnight: one integer compare, no datetime math
+        self._roll_day()
+        return self.usage_data[user_id]
+    
     def check_guest_limit(self, session_id: str) -> Dict:
         """
         Check if guest session is within limits
@@ -63,16 +124,11 @@ class RateLimiter:
         Returns:
             dict with allowed: bool, remaining: int, message: str
         """
+        # Sessions older than 30 minutes have expired out of the cache, so
+        # this is either a live session or a fresh one
         session = self.guest_sessions[session_id]
         limit = self.LIMITS['guest']['translations_per_session']
         
-        # Check session age (expire after 30 minutes)
-        session_age = datetime.now() - session['created_at']
-        if session_age > timedelta(minutes=30):
-            # Reset session
-            session['messages'] = 0
-            session['created_at'] = datetime.now()
-        
         # Check message limit
         if session['messages'] >= limit:
             return {
@@ -124,17 +180,9 @@ class RateLimiter:
             }
         
         # Check free tier limits
-        user = self.usage_data[user_id]
+        user = self._daily_usage(user_id)
         limit = self.LIMITS['free']['translations_per_day']
         
-        # Reset daily at midnight
-        now = datetime.now()
-        time_since_reset = now - user['last_reset']
-        
-        if time_since_reset > timedelta(days=1):
-            user['translations'] = 0
-            user['last_reset'] = now
-        
         # Check limit
         if user['translations'] >= limit:
             return {
@@ -143,7 +191,7 @@ class RateLimiter:
                 'limit': limit,
                 'message': f"Daily limit reached ({limit} translations). Upgrade to Pro for unlimited!",
                 'upgrade_required': True,
-                'reset_at': (user['last_reset'] + timedelta(days=1)).isoformat()
+                'reset_at': _day_start_iso(user['reset_day'] + 1)
             }
         
         # Increment and allow
@@ -182,7 +230,7 @@ class RateLimiter:
             }
         
         # Check video minute limits
-        user = self.usage_data[user_id]
+        user = self._daily_usage(user_id)
         
         if user_tier == 'paid':
             return {
@@ -194,21 +242,13 @@ class RateLimiter:
         # Free tier video limits
         limit = self.LIMITS['free']['video_minutes_per_day']
         
-        # Reset daily
-        now = datetime.now()
-        time_since_reset = now - user['last_reset']
-        
-        if time_since_reset > timedelta(days=1):
-            user['video_minutes'] = 0
-            user['last_reset'] = now
-        
         if user['video_minutes'] >= limit:
             return {
                 'allowed': False,
                 'remaining_minutes': 0,
                 'message': f"Daily video limit reached ({limit} minutes). Upgrade to Pro!",
                 'upgrade_required': True,
-                'reset_at': (user['last_reset'] + timedelta(days=1)).isoformat()
+                'reset_at': _day_start_iso(user['reset_day'] + 1)
             }
         
         return {
@@ -219,17 +259,17 @@ class RateLimiter:
     
     def record_video_usage(self, user_id: str, minutes: float):
         """Record video minutes used"""
-        user = self.usage_data[user_id]
+        user = self._daily_usage(user_id)
         user['video_minutes'] += minutes
     
     def get_usage_stats(self, user_id: str, user_tier: str = 'free') -> Dict:
         """Get user's current usage statistics"""
-        user = self.usage_data[user_id]
+        user = self._daily_usage(user_id)
         limits = self.LIMITS[user_tier]
         
         # Calculate time until reset
-        next_reset = user['last_reset'] + timedelta(days=1)
-        hours_until_reset = (next_reset - datetime.now()).total_seconds() / 3600
+        next_reset_day = user['reset_day'] + 1
+        hours_until_reset = (next_reset_day * SECONDS_PER_DAY - time.time()) / 3600
         
         return {
             'tier': user_tier,
@@ -244,28 +284,27 @@ class RateLimiter:
                 'remaining_minutes': max(0, limits['video_minutes_per_day'] - user['video_minutes'])
             },
             'reset_in_hours': max(0, hours_until_reset),
-            'next_reset': next_reset.isoformat()
+            'next_reset': _day_start_iso(next_reset_day)
         }
     
     def cleanup_old_sessions(self):
-        """Clean up expired guest sessions (run periodically)"""
-        now = datetime.now()
-        expired = []
-        
-        for session_id, data in self.guest_sessions.items():
-            age = now - data['created_at']
-            if age > timedelta(hours=1):
-                expired.append(session_id)
+        """
+        Drop expired guest sessions and past days' usage now
         
-        for session_id in expired:
-            del self.guest_sessions[session_id]
+        Optional: guest sessions already evict on their own as they are used
+        and usage resets on the first access of a new day; this just releases
+        memory early on an idle process.
+        """
+        expired = self.guest_sessions.expire()
+        self._roll_day()
         
-        print(f"🗑️ Cleaned up {len(expired)} expired guest sessions")
+        logger.info("🗑️ Cleaned up %d expired guest sessions", expired)
         
-        return len(expired)
+        return expired
     
     def get_all_stats(self) -> Dict:
         """Get global statistics"""
+        self._roll_day()
         total_guests = len(self.guest_sessions)
         total_users = len(self.usage_data)
         
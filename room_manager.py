@@ -1,28 +1,116 @@
 # app/services/room_manager.py - V2 Bidirectional
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from collections import Counter
 from fastapi import WebSocket
-import random
-import string
+import asyncio
+import heapq
+import logging
+import orjson
+import base64
+import os
+import time
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# SIMD base64 for audio payloads (optional - same API as the stdlib module)
+try:
+    from pybase64 import b64encode_as_string
+except ImportError:
+    from base64 import b64encode
+    
+    def b64encode_as_string(s: bytes) -> str:
+        return b64encode(s).decode('ascii')
+
+# Binary codec clients can opt into at join (optional)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logger.warning("⚠️  msgpack not available - msgpack codec disabled")
+
+# Max encoded messages waiting to be written to one participant's socket
+OUTBOX_SIZE = int(os.getenv("WS_OUTBOX_SIZE", 256))
+
+def resolve_codec(requested: Optional[str]) -> str:
+    """Pick the wire codec for a client: msgpack if requested and installed, else JSON"""
+    if requested == "msgpack" and MSGPACK_AVAILABLE:
+        return "msgpack"
+    return "json"
+
+def encode_message(message: dict, codec: str) -> bytes:
+    """
+    Encode an outgoing message for a codec
+    
+    translated_audio travels as raw bytes: msgpack clients get it as is,
+    a third smaller than base64; JSON clients get it base64 encoded here.
+    """
+    if codec == "msgpack":
+        return msgpack.packb(message)
+    audio = message.get("translated_audio")
+    if audio:
+        message = {**message, "translated_audio": b64encode_as_string(audio)}
+    return orjson.dumps(message)
+
+def _batch_frame(batch: List[bytes], codec: str) -> bytes:
+    """Wrap already-encoded messages in one {"type": "batch", "messages": [...]} frame"""
+    if codec == "msgpack":
+        # map(2) + "type": "batch" + "messages": array header + packed items
+        count = len(batch)
+        if count < 16:
+            header = bytes((0x90 | count,))
+        elif count < 0x10000:
+            header = b"\xdc" + count.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + count.to_bytes(4, "big")
+        return _MSGPACK_BATCH_PREFIX + header + b"".join(batch)
+    
+    # Payloads are already JSON, so join the bytes instead of re-encoding
+    return b'{"type":"batch","messages":[' + b",".join(batch) + b"]}"
+
+if MSGPACK_AVAILABLE:
+    _MSGPACK_BATCH_PREFIX = (
+        b"\x82" + msgpack.packb("type") + msgpack.packb("batch") + msgpack.packb("messages")
+    )
+
+async def send_json_fast(websocket: WebSocket, message: dict):
+    """Send a JSON message as a UTF-8 binary frame encoded with orjson"""
+    await websocket.send_bytes(orjson.dumps(message))
+
+async def receive_json_fast(websocket: WebSocket) -> dict:
+    """Receive a text frame and decode it with orjson"""
+    return orjson.loads(await websocket.receive_text())
+
+@dataclass(slots=True)
 class Participant:
     """Represents a participant in a conversation"""
     user_id: str
     user_name: str
     language: str  # User's native language (e.g., "en", "zh", "es")
     websocket: WebSocket
-    joined_at: datetime
+    joined_at: float  # Unix timestamp (time.time())
+    codec: str = "json"  # Wire format negotiated at join ("json" or "msgpack")
+    wants_audio: bool = True  # False if the client opted out of TTS at join
+    # Encoded frames waiting for this participant's writer task
+    outbox: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=OUTBOX_SIZE), repr=False)
+    writer_task: Optional[asyncio.Task] = field(default=None, repr=False)
 
 @dataclass
 class ConversationRoom:
     """Represents a conversation room with bidirectional translation"""
     room_code: str
-    created_at: datetime
+    created_at: float  # Unix timestamp (time.time())
     participants: Dict[str, Participant] = field(default_factory=dict)  # user_id -> Participant
     is_active: bool = True
     message_count: int = 0
+    # Current "en ↔ zh"-style key counted in RoomManager.language_pairs
+    language_pair: Optional[str] = None
+    # Daily.co URL, set when the video room is created (None if unknown)
+    video_url: Optional[str] = None
+    # sender_id -> translation targets, cleared whenever membership changes
+    _targets_cache: Dict[str, Tuple[Tuple[Participant, str, str], ...]] = field(default_factory=dict, repr=False)
     
     def get_participant(self, user_id: str) -> Optional[Participant]:
         """Get participant by user ID"""
@@ -30,28 +118,36 @@ class ConversationRoom:
     
     def get_other_participants(self, user_id: str) -> List[Participant]:
         """Get all participants except the specified user"""
-        return [p for uid, p in self.participants.items() if uid != user_id]
+        return [p for p in self.participants.values() if p.user_id != user_id]
     
-    def get_translation_targets(self, sender_id: str) -> List[tuple[Participant, str, str]]:
+    def get_translation_targets(self, sender_id: str) -> Tuple[Tuple[Participant, str, str], ...]:
         """
         Get translation targets for a message
         
-        Returns list of tuples: (participant, source_lang, target_lang)
-        This tells us who to send to and what language pair to use
+        Returns tuple of tuples: (participant, source_lang, target_lang)
+        This tells us who to send to and what language pair to use.
+        The result is cached until membership changes; it is immutable
+        so every message from this sender can share it.
         """
+        cached = self._targets_cache.get(sender_id)
+        if cached is not None:
+            return cached
+        
         sender = self.get_participant(sender_id)
         if not sender:
-            return []
+            return ()
         
-        targets = []
-        for participant in self.get_other_participants(sender_id):
-            # Translate from sender's language to participant's language
-            targets.append((
+        # Translate from sender's language to each participant's language
+        targets = tuple(
+            (
                 participant,
                 sender.language,      # source language
                 participant.language  # target language
-            ))
+            )
+            for participant in self.get_other_participants(sender_id)
+        )
         
+        self._targets_cache[sender_id] = targets
         return targets
 
 class RoomManager:
@@ -59,12 +155,23 @@ class RoomManager:
     
     def __init__(self):
         self.rooms: Dict[str, ConversationRoom] = {}
+        # Min-heap of (next_check_time, room_code) for cleanup_inactive_rooms
+        self._expiry_heap: List[Tuple[float, str]] = []
+        
+        # Running totals for get_stats, kept in sync on join/leave/broadcast/close
+        self.total_participants: int = 0
+        self.total_messages: int = 0
+        self.language_pairs: Counter = Counter()
+        
+        # Close handshakes for slow consumers, referenced until they finish
+        self._closing: set = set()
     
     def generate_room_code(self) -> str:
         """Generate a unique 6-character room code"""
         while True:
-            # Generate code like: ABC123
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+            # Generate code like: K7QZ2M - 30 random bits from the OS CSPRNG,
+            # base32 encoded (A-Z, 2-7) in a single C call
+            code = base64.b32encode(os.urandom(4)).decode()[:6]
             if code not in self.rooms:
                 return code
     
@@ -76,17 +183,20 @@ class RoomManager:
         
         room = ConversationRoom(
             room_code=room_code,
-            created_at=datetime.now()
+            created_at=time.time()
         )
         
         self.rooms[room_code] = room
         
-        print(f"✅ Created room {room_code} (bidirectional translation enabled)")
+        # First check: rooms nobody joined are dropped after an hour
+        heapq.heappush(self._expiry_heap, (room.created_at + 3600, room_code))
+        
+        logger.info("✅ Created room %s (bidirectional translation enabled)", room_code)
         
         return room
     
     def get_room(self, room_code: str) -> Optional[ConversationRoom]:
-        """Get room by code"""
+        """Get room by code (codes are uppercase; callers normalize before lookup)"""
         return self.rooms.get(room_code)
     
     def add_participant(
@@ -95,7 +205,9 @@ class RoomManager:
         user_id: str, 
         user_name: str,
         language: str,
-        websocket: WebSocket
+        websocket: WebSocket,
+        codec: str = "json",
+        wants_audio: bool = True
     ) -> bool:
         """
         Add participant to room with their native language
@@ -106,6 +218,8 @@ class RoomManager:
             user_name: Display name
             language: User's native language code (e.g., "en", "zh")
             websocket: WebSocket connection
+            codec: Wire format for messages to this participant (see resolve_codec)
+            wants_audio: Whether to synthesize speech for this participant
             
         Returns:
             True if added successfully, False otherwise
@@ -120,38 +234,67 @@ class RoomManager:
             user_name=user_name,
             language=language,
             websocket=websocket,
-            joined_at=datetime.now()
+            joined_at=time.time(),
+            codec=codec,
+            wants_audio=wants_audio
         )
         
+        previous = room.participants.get(user_id)
+        if previous is None:
+            self.total_participants += 1
+        else:
+            # Same user_id reconnected: the old socket is replaced, not shared
+            self._stop_writer(previous)
+            self._schedule_close(previous, 1000)
         room.participants[user_id] = participant
+        participant.writer_task = asyncio.create_task(self._write_loop(participant))
+        room._targets_cache.clear()
+        self._update_language_pair(room)
         
-        print(f"✅ User {user_name} ({user_id}) joined room {room_code}")
-        print(f"   Language: {language} | Total participants: {len(room.participants)}")
+        participant_count = len(room.participants)
+        logger.info(
+            "✅ User %s (%s) joined room %s | Language: %s | Total participants: %d",
+            user_name, user_id, room_code, language, participant_count
+        )
         
-        # Print language pairs for debugging
-        if len(room.participants) > 1:
-            print(f"   Active language pairs:")
-            for uid, p in room.participants.items():
-                others = [f"{other.language}" for other_uid, other in room.participants.items() if other_uid != uid]
-                if others:
-                    print(f"      {p.language} → {', '.join(others)}")
+        # Log the room's language mix for debugging
+        if participant_count > 1 and logger.isEnabledFor(logging.DEBUG):
+            languages = Counter(p.language for p in room.participants.values())
+            logger.debug("   Active languages: %s", dict(languages))
         
         return True
     
-    def remove_participant(self, room_code: str, user_id: str):
-        """Remove participant from room"""
+    def remove_participant(self, room_code: str, user_id: str) -> Optional[int]:
+        """
+        Remove participant from room
+        
+        Returns:
+            Number of participants left (0 means the room was closed),
+            or None if the room or participant was not found
+        """
         room = self.rooms.get(room_code)
         
         if room and user_id in room.participants:
             participant = room.participants[user_id]
             del room.participants[user_id]
+            self._stop_writer(participant)
+            room._targets_cache.clear()
+            self.total_participants -= 1
+            self._update_language_pair(room)
             
-            print(f"❌ User {participant.user_name} ({user_id}) left room {room_code}")
-            print(f"   Remaining participants: {len(room.participants)}")
+            remaining = len(room.participants)
+            logger.info(
+                "❌ User %s (%s) left room %s | Remaining participants: %d",
+                participant.user_name, user_id, room_code, remaining
+            )
             
             # Close room if no participants
-            if len(room.participants) == 0:
+            if remaining == 0:
                 self.close_room(room_code)
+            
+            return remaining
+        
+        return None
     
     async def broadcast_to_room(
         self, 
@@ -172,15 +315,106 @@ class RoomManager:
         if not room:
             return
         
-        # Send to all participants except excluded user
-        for user_id, participant in room.participants.items():
-            if user_id != exclude_user:
-                try:
-                    await participant.websocket.send_json(message)
-                except Exception as e:
-                    print(f"❌ Failed to send to {participant.user_name} ({user_id}): {e}")
+        # Encode once, queue the same bytes for all participants except excluded user
+        recipients = [p for p in room.participants.values() if p.user_id != exclude_user]
+        self._enqueue(recipients, message)
         
         room.message_count += 1
+        self.total_messages += 1
+    
+    async def send_to_participants(self, participants: List[Participant], message: dict):
+        """
+        Send the same message to several participants, encoding it once per codec
+        
+        Args:
+            participants: Target participants
+            message: Message to send
+        """
+        self._enqueue(participants, message)
+    
+    def _enqueue(self, participants: List[Participant], message: dict):
+        """Encode once per codec and queue the bytes on each outbox (never waits on a socket)"""
+        encoded: Dict[str, bytes] = {}
+        
+        for participant in participants:
+            # Writer already stopped (leaving or being disconnected)
+            if participant.writer_task is None:
+                continue
+            
+            payload = encoded.get(participant.codec)
+            if payload is None:
+                payload = encoded[participant.codec] = encode_message(message, participant.codec)
+            
+            try:
+                participant.outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._disconnect_slow_consumer(participant)
+    
+    def _disconnect_slow_consumer(self, participant: Participant):
+        """
+        Disconnect a participant whose outbox is full
+        
+        Dropping frames would silently lose chat lines, and waiting would
+        let one slow reader stall every sender, so the socket is closed
+        with 1013 (try again later). Its receive loop then ends and the
+        normal leave path removes the participant.
+        """
+        logger.warning(
+            "⚠️  Outbox full for %s (%s), disconnecting slow client",
+            participant.user_name, participant.user_id
+        )
+        self._stop_writer(participant)
+        self._schedule_close(participant, 1013)
+    
+    def _schedule_close(self, participant: Participant, code: int):
+        """Close a participant's socket in the background (tracked until done)"""
+        task = asyncio.create_task(self._close_socket(participant, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+    
+    async def _close_socket(self, participant: Participant, code: int):
+        """Close a participant's socket, ignoring one that is already gone"""
+        try:
+            await participant.websocket.close(code=code)
+        except Exception as e:
+            logger.debug("Close failed for %s: %s", participant.user_id, e)
+    
+    async def _write_loop(self, participant: Participant):
+        """
+        Write a participant's queued frames to their socket
+        
+        Waits for the first frame, then drains everything else already
+        queued and sends it as one {"type": "batch", "messages": [...]}
+        frame, so bursts cost one socket write instead of one per message.
+        A lone frame is sent unwrapped.
+        """
+        outbox = participant.outbox
+        
+        while True:
+            payload = await outbox.get()
+            
+            if not outbox.empty():
+                batch = [payload]
+                while True:
+                    try:
+                        batch.append(outbox.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                payload = _batch_frame(batch, participant.codec)
+            
+            try:
+                await participant.websocket.send_bytes(payload)
+            except Exception as e:
+                logger.warning("❌ Failed to send to %s (%s): %s", participant.user_name, participant.user_id, e)
+                # Mark the writer gone so _enqueue stops filling a dead outbox
+                participant.writer_task = None
+                return
+    
+    def _stop_writer(self, participant: Participant):
+        """Cancel a participant's writer task (queued frames are dropped)"""
+        if participant.writer_task is not None:
+            participant.writer_task.cancel()
+            participant.writer_task = None
     
     async def send_to_user(self, room_code: str, user_id: str, message: dict):
         """
@@ -199,71 +433,115 @@ class RoomManager:
         participant = room.participants.get(user_id)
         
         if participant:
-            try:
-                await participant.websocket.send_json(message)
-            except Exception as e:
-                print(f"❌ Failed to send to {participant.user_name} ({user_id}): {e}")
+            self._enqueue([participant], message)
     
     def close_room(self, room_code: str):
-        """Close and remove a room"""
+        """
+        Close and remove a room
+        
+        Anyone still connected is disconnected with 1001 (going away); their
+        receive loops then end without a leave notice, since the room is gone.
+        """
         room = self.rooms.get(room_code)
         
         if room:
             room.is_active = False
+            for participant in room.participants.values():
+                self._stop_writer(participant)
+                self._schedule_close(participant, 1001)
+            
+            # Drop its share of the running totals
+            self.total_participants -= len(room.participants)
+            self.total_messages -= room.message_count
+            if room.language_pair:
+                self._count_language_pair(room.language_pair, -1)
             
             # Remove room
             del self.rooms[room_code]
-            print(f"🗑️ Closed room {room_code}")
+            logger.info("🗑️ Closed room %s", room_code)
     
-    def cleanup_inactive_rooms(self, max_age_hours: int = 24):
-        """Clean up rooms older than max_age_hours"""
-        now = datetime.now()
+    def cleanup_inactive_rooms(self, max_age_hours: int = 24) -> List[str]:
+        """
+        Clean up rooms older than max_age_hours, or empty for over an hour
+        
+        Only rooms whose scheduled check time has passed are examined, so
+        each call costs O(k log n) for k due rooms instead of a full scan.
+        
+        Returns:
+            Codes of the rooms that were closed (their video rooms are the
+            caller's to delete)
+        """
+        now = time.time()
         rooms_to_close = []
         
-        for room_code, room in self.rooms.items():
-            age = (now - room.created_at).total_seconds() / 3600
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, room_code = heapq.heappop(self._expiry_heap)
+            room = self.rooms.get(room_code)
+            
+            # Already closed
+            if not room:
+                continue
+            
+            age = (now - room.created_at) / 3600
             
-            if age > max_age_hours or (len(room.participants) == 0 and age > 1):
+            if age >= max_age_hours or (len(room.participants) == 0 and age >= 1):
                 rooms_to_close.append(room_code)
+            else:
+                # Still in use (or a reused code): check again later
+                next_check = 3600 if age < 1 else max_age_hours * 3600
+                heapq.heappush(self._expiry_heap, (room.created_at + next_check, room_code))
         
         for room_code in rooms_to_close:
             self.close_room(room_code)
         
         if rooms_to_close:
-            print(f"🗑️ Cleaned up {len(rooms_to_close)} inactive rooms")
+            logger.info("🗑️ Cleaned up %d inactive rooms", len(rooms_to_close))
+        
+        return rooms_to_close
     
-    def get_stats(self) -> dict:
-        """Get statistics about active rooms"""
-        total_participants = sum(len(room.participants) for room in self.rooms.values())
-        total_messages = sum(room.message_count for room in self.rooms.values())
-        
-        # Get language pair statistics
-        language_pairs = {}
-        for room in self.rooms.values():
-            languages = sorted(set(p.language for p in room.participants.values()))
-            if len(languages) >= 2:
-                pair = " ↔ ".join(languages)
-                language_pairs[pair] = language_pairs.get(pair, 0) + 1
+    def _update_language_pair(self, room: ConversationRoom):
+        """Recompute a room's language pair key after its membership changed"""
+        languages = sorted(set(p.language for p in room.participants.values()))
+        pair = " ↔ ".join(languages) if len(languages) >= 2 else None
         
+        if pair != room.language_pair:
+            if room.language_pair:
+                self._count_language_pair(room.language_pair, -1)
+            if pair:
+                self._count_language_pair(pair, 1)
+            room.language_pair = pair
+    
+    def _count_language_pair(self, pair: str, delta: int):
+        """Adjust the running count for a language pair, dropping zeros"""
+        self.language_pairs[pair] += delta
+        if self.language_pairs[pair] <= 0:
+            del self.language_pairs[pair]
+    
+    def get_stats(self) -> dict:
+        """Get statistics about active rooms (O(1), from running totals)"""
+        # Closed rooms are removed from self.rooms, so every stored room is active
         return {
             "total_rooms": len(self.rooms),
-            "active_rooms": sum(1 for room in self.rooms.values() if room.is_active),
-            "total_participants": total_participants,
-            "total_messages": total_messages,
-            "language_pairs": language_pairs,
-            "rooms": [
-                {
-                    "code": room.room_code,
-                    "participants": [
-                        {
-                            "name": p.user_name,
-                            "language": p.language,
-                            "joined_at": p.joined_at.isoformat()
-                        }
-                        for p in room.participants.values()
-                    ],
-                    "created_at": room.created_at.isoformat()
-                }
-                for room in self.rooms.values()
-            ]
-        }
\ No newline at end of file
+            "active_rooms": len(self.rooms),
+            "total_participants": self.total_participants,
+            "total_messages": self.total_messages,
+            "language_pairs": dict(self.language_pairs)
+        }
+    
+    def get_room_details(self) -> List[dict]:
+        """Get per-room participant listings (walks every room)"""
+        return [
+            {
+                "code": room.room_code,
+                "participants": [
+                    {
+                        "name": p.user_name,
+                        "language": p.language,
+                        "joined_at": datetime.fromtimestamp(p.joined_at).isoformat()
+                    }
+                    for p in room.participants.values()
+                ],
+                "created_at": datetime.fromtimestamp(room.created_at).isoformat()
+            }
+            for room in self.rooms.values()
+        ]
\ No newline at end of file
@@ -1,17 +1,36 @@
 # translation_pipeline.py - Azure Translator Ready (V2 Bidirectional)
 import os
-import base64
+import asyncio
+import hashlib
 import io
-from typing import Optional, Dict
+import logging
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional, Dict, List
 import json
+from cachetools import LRUCache
+
+# Same base64 helper the wire encoder uses (pybase64 when installed)
+from room_manager import b64encode_as_string
+
+logger = logging.getLogger(__name__)
 
 # Azure Translator (will be enabled when you add credentials)
 try:
-    import requests
+    import httpx
     AZURE_AVAILABLE = True
 except ImportError:
     AZURE_AVAILABLE = False
-    print("⚠️  requests not available - Azure Translator disabled")
+    logger.warning("⚠️  httpx not available - Azure Translator disabled")
+
+# Keep-alive pool for Azure Translator calls
+AZURE_MAX_CONNECTIONS = int(os.getenv("AZURE_MAX_CONNECTIONS", 20))
+AZURE_KEEPALIVE_SECONDS = float(os.getenv("AZURE_KEEPALIVE_SECONDS", 120))
+
+# Azure Translator per-request limits (array elements / total characters)
+AZURE_MAX_BATCH_TEXTS = 100
+AZURE_MAX_BATCH_CHARS = 10000
 
 # Text-to-Speech (optional for now)
 try:
@@ -19,7 +38,97 @@ try:
     TTS_AVAILABLE = True
 except ImportError:
     TTS_AVAILABLE = False
-    print("⚠️  gTTS not available - Text-to-speech disabled")
+    logger.warning("⚠️  gTTS not available - Text-to-speech disabled")
+
+# Local neural TTS (optional - used for languages with a voice in PIPER_VOICES_DIR)
+try:
+    from piper.voice import PiperVoice
+    PIPER_AVAILABLE = True
+except ImportError:
+    PIPER_AVAILABLE = False
+
+# Persistent TTS cache (optional - enabled by TTS_DISK_CACHE_DIR)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+
+# Supported language codes (Azure supports 100+)
+SUPPORTED_LANGUAGES = MappingProxyType({
+    "en": "English",
+    "zh-Hans": "Chinese (Simplified)",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "pt": "Portuguese",
+    "it": "Italian",
+    "ru": "Russian",
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "tr": "Turkish",
+    "nl": "Dutch",
+    "pl": "Polish",
+    "vi": "Vietnamese",
+    "th": "Thai",
+    "fa": "Persian (Farsi)",
+    "da": "Danish",
+    "sv": "Swedish",
+    "no": "Norwegian",
+    "fi": "Finnish",
+})
+
+# Language code mapping (frontend code -> Azure code)
+LANGUAGE_MAP = MappingProxyType({
+    "zh": "zh-Hans",  # Map simplified Chinese
+    "en": "en",
+    "es": "es",
+    "fr": "fr",
+    "de": "de",
+    "ja": "ja",
+    "ko": "ko",
+    "pt": "pt",
+    "it": "it",
+    "ru": "ru",
+    "ar": "ar",
+    "hi": "hi",
+    "tr": "tr",
+    "nl": "nl",
+    "pl": "pl",
+    "vi": "vi",
+    "th": "th",
+    "fa": "fa",
+    "da": "da",
+    "sv": "sv",
+    "no": "no",
+    "fi": "fi",
+})
+
+# Frontend/Azure code -> gTTS language code
+TTS_LANGUAGE_MAP = MappingProxyType({
+    "zh": "zh-CN",
+    "zh-Hans": "zh-CN",
+    "en": "en",
+    "es": "es",
+    "fr": "fr",
+    "de": "de",
+    "ja": "ja",
+    "ko": "ko",
+    "pt": "pt",
+    "it": "it",
+    "ru": "ru",
+    "ar": "ar",
+    "hi": "hi",
+    "tr": "tr",
+    "nl": "nl",
+    "pl": "pl",
+    "vi": "vi",
+    "th": "th",
+    "fa": "fa",
+})
 
 
 class TranslationPipeline:
@@ -38,72 +147,100 @@ class TranslationPipeline:
             "https://api.cognitive.microsofttranslator.com"
         )
         self.azure_region = os.getenv("AZURE_TRANSLATOR_REGION", "global")
+        self._azure_url = self.azure_endpoint + '/translate'
         
         # Check if Azure is configured
         self.azure_enabled = bool(self.azure_key and AZURE_AVAILABLE)
         
         if not self.azure_enabled:
-            print("⚠️  Azure Translator NOT configured - running in DEMO mode")
-            print("   Set AZURE_TRANSLATOR_KEY to enable translation")
+            logger.warning("⚠️  Azure Translator NOT configured - running in DEMO mode")
+            logger.warning("   Set AZURE_TRANSLATOR_KEY to enable translation")
         else:
-            print("✅ Azure Translator initialized")
-            print(f"   Region: {self.azure_region}")
-        
-        # Supported language codes (Azure supports 100+)
-        self.supported_languages = {
-            "en": "English",
-            "zh-Hans": "Chinese (Simplified)",
-            "es": "Spanish",
-            "fr": "French",
-            "de": "German",
-            "ja": "Japanese",
-            "ko": "Korean",
-            "pt": "Portuguese",
-            "it": "Italian",
-            "ru": "Russian",
-            "ar": "Arabic",
-            "hi": "Hindi",
-            "tr": "Turkish",
-            "nl": "Dutch",
-            "pl": "Polish",
-            "vi": "Vietnamese",
-            "th": "Thai",
-            "fa": "Persian (Farsi)",
-            "da": "Danish",
-            "sv": "Swedish",
-            "no": "Norwegian",
-            "fi": "Finnish",
-        }
+            logger.info("✅ Azure Translator initialized")
+            logger.info("   Region: %s", self.azure_region)
+        
+        # Static language tables (shared, read-only)
+        self.supported_languages = SUPPORTED_LANGUAGES
+        self.language_map = LANGUAGE_MAP
+        
+        # Frontend codes accepted by validate_language
+        self.language_codes = frozenset(self.language_map)
         
-        # Language code mapping (frontend code -> Azure code)
-        self.language_map = {
-            "zh": "zh-Hans",  # Map simplified Chinese
-            "en": "en",
-            "es": "es",
-            "fr": "fr",
-            "de": "de",
-            "ja": "ja",
-            "ko": "ko",
-            "pt": "pt",
-            "it": "it",
-            "ru": "ru",
-            "ar": "ar",
-            "hi": "hi",
-            "tr": "tr",
-            "nl": "nl",
-            "pl": "pl",
-            "vi": "vi",
-            "th": "th",
-            "fa": "fa",
-            "da": "da",
-            "sv": "sv",
-            "no": "no",
-            "fi": "fi",
+        # Recently translated phrases: (text, source, target) -> result
+        self._translation_cache = LRUCache(
+            maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", 4096))
+        )
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # Speech: local Piper voices where configured, gTTS for the rest
+        self._piper_voices = self._load_piper_voices(os.getenv("PIPER_VOICES_DIR"))
+        self.tts_enabled = TTS_AVAILABLE or bool(self._piper_voices)
+        
+        # Synthesized speech: (translated_text, language) -> raw audio bytes
+        self._audio_cache = LRUCache(maxsize=int(os.getenv("TTS_CACHE_SIZE", 1024)))
+        
+        # Raw audio on disk, so repeated phrases survive restarts without re-synthesis
+        self._disk_audio_cache = None
+        disk_cache_dir = os.getenv("TTS_DISK_CACHE_DIR")
+        if disk_cache_dir and self.tts_enabled:
+            if DISKCACHE_AVAILABLE:
+                self._disk_audio_cache = diskcache.Cache(
+                    disk_cache_dir,
+                    size_limit=int(os.getenv("TTS_DISK_CACHE_MB", 512)) * 1024 * 1024,
+                    eviction_policy="least-recently-used"
+                )
+                logger.info("✅ TTS disk cache: %s", disk_cache_dir)
+            else:
+                logger.warning("⚠️  diskcache not available - TTS_DISK_CACHE_DIR ignored")
+        
+        # Azure calls share one pooled HTTP/2 client (closed in aclose), so
+        # chat turns reuse TLS connections instead of handshaking each time
+        self._http = None
+        if self.azure_enabled:
+            self._http = httpx.AsyncClient(
+                headers={
+                    'Ocp-Apim-Subscription-Key': self.azure_key,
+                    'Ocp-Apim-Subscription-Region': self.azure_region,
+                    'Content-type': 'application/json',
+                },
+                timeout=10.0,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=AZURE_MAX_CONNECTIONS,
+                    max_keepalive_connections=AZURE_MAX_CONNECTIONS,
+                    keepalive_expiry=AZURE_KEEPALIVE_SECONDS
+                )
+            )
+        
+        # gTTS and Piper block, so they run here instead of on the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("TRANSLATE_WORKERS", 8)),
+            thread_name_prefix="translate"
+        )
+        
+        # The language set is static, so build the lookup payloads once
+        self._languages_payload = {
+            "mode": "bidirectional",
+            "azure_enabled": self.azure_enabled,
+            "tts_enabled": self.tts_enabled,
+            "total_languages": len(self.supported_languages),
+            "languages": list(self.language_map.keys()),
+            "language_names": dict(self.supported_languages)
+        }
+        self._language_info = {
+            code: {
+                "code": code,
+                "azure_code": azure_code,
+                "name": self.supported_languages.get(azure_code, "Unknown"),
+                "supported": True
+            }
+            for code, azure_code in self.language_map.items()
         }
         
-        print(f"✅ Translation pipeline initialized")
-        print(f"   Supported languages: {len(self.supported_languages)}")
-        print(f"   Mode: {'Azure Translation' if self.azure_enabled else 'DEMO (no translation)'}")
+        logger.info("✅ Translation pipeline initialized")
+        logger.info("   Supported languages: %d", len(self.supported_languages))
+        logger.info("   Mode: %s", 'Azure Translation' if self.azure_enabled else 'DEMO (no translation)')
     
     async def process_text(
         self, 
@@ -112,7 +249,11 @@ class TranslationPipeline:
         target_lang: str
     ) -> Dict:
         """
-        Translate text from source language to target language
+        Translate text from source language to target language, with speech
+        
+        Combines translate_text and synthesize; callers that can deliver
+        audio separately should use those directly so text isn't held up
+        by TTS.
         
         Args:
             text: Text to translate
@@ -122,85 +263,253 @@ class TranslationPipeline:
         Returns:
             dict with status, original_text, translated_text, translated_audio
         """
+        result = await self.translate_text(text, source_lang, target_lang)
+        
+        audio_base64 = ""
+        if result["status"] == "success":
+            audio_base64 = await self.synthesize(result["translated_text"], target_lang)
+        
+        return {**result, "translated_audio": audio_base64}
+    
+    async def translate_text(
+        self, 
+        text: str, 
+        source_lang: str, 
+        target_lang: str
+    ) -> Dict:
+        """
+        Translate text from source language to target language (no TTS)
+        
+        Args:
+            text: Text to translate
+            source_lang: Source language code (e.g., "en", "zh")
+            target_lang: Target language code (e.g., "es", "fr")
+        
+        Returns:
+            dict with status, original_text, translated_text
+        """
+        
+        # Nothing to translate; don't spend a cache slot on it either
+        if not text or text.isspace():
+            return {
+                "status": "success",
+                "original_text": text,
+                "translated_text": text,
+                "source_lang": source_lang,
+                "target_lang": target_lang
+            }
+        
+        # Repeated phrases skip the translation call
+        cache_key = (text, source_lang, target_lang)
+        cached = self._translation_cache.get(cache_key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+        self._cache_misses += 1
         
         try:
             # Map language codes to Azure format
             azure_source = self.language_map.get(source_lang, source_lang)
             azure_target = self.language_map.get(target_lang, target_lang)
             
+            # Failed Azure calls degrade the result, so don't cache those
+            cacheable = True
+            
             # If same language, no translation needed
             if source_lang == target_lang:
                 translated_text = text
-                print(f"ℹ️  Same language ({source_lang}), no translation needed")
+                logger.debug("ℹ️  Same language (%s), no translation needed", source_lang)
             
             # If Azure is enabled, translate
             elif self.azure_enabled:
-                translated_text = await self._translate_with_azure(
-                    text, 
+                translated = await self._translate_with_azure(
+                    [text], 
                     azure_source, 
                     azure_target
                 )
-                print(f"✅ Translated: {source_lang} → {target_lang}")
-                print(f"   Original: {text}")
-                print(f"   Translated: {translated_text}")
+                if translated is None:
+                    translated_text = text
+                    cacheable = False
+                else:
+                    translated_text = translated[0]
+                logger.debug("✅ Translated: %s → %s", source_lang, target_lang)
+                logger.debug("   Original: %s", text)
+                logger.debug("   Translated: %s", translated_text)
             
             # Demo mode - just return original text with a note
             else:
                 translated_text = f"[DEMO MODE - No translation] {text}"
-                print(f"⚠️  Demo mode: returning original text")
-            
-            # Generate TTS audio (optional)
-            audio_base64 = ""
-            if TTS_AVAILABLE:
-                audio_base64 = await self._text_to_speech(translated_text, target_lang)
+                logger.debug("⚠️  Demo mode: returning original text")
             
-            return {
+            result = {
                 "status": "success",
                 "original_text": text,
                 "translated_text": translated_text,
-                "translated_audio": audio_base64,
                 "source_lang": source_lang,
                 "target_lang": target_lang
             }
+            if cacheable:
+                self._translation_cache[cache_key] = result
+            
+            return result
         
         except Exception as e:
-            print(f"❌ Error in translation: {e}")
+            logger.error("❌ Error in translation: %s", e)
             return {
                 "status": "error",
                 "error": str(e),
                 "original_text": text,
                 "translated_text": text,  # Return original on error
-                "translated_audio": "",
                 "source_lang": source_lang,
                 "target_lang": target_lang
             }
     
+    async def translate_batch(
+        self, 
+        texts: List[str], 
+        source_lang: str, 
+        target_lang: str
+    ) -> List[str]:
+        """
+        Translate several texts between one language pair
+        
+        Cached texts are answered locally; the rest go to Azure together,
+        as few requests as its per-request limits allow.
+        
+        Args:
+            texts: Texts to translate
+            source_lang: Source language code (e.g., "en", "zh")
+            target_lang: Target language code (e.g., "es", "fr")
+        
+        Returns:
+            Translated texts in input order (originals where translation failed)
+        """
+        
+        # Same language and demo mode never call Azure anyway
+        if source_lang == target_lang or not self.azure_enabled:
+            return [
+                (await self.translate_text(text, source_lang, target_lang))["translated_text"]
+                for text in texts
+            ]
+        
+        results = list(texts)
+        misses = []
+        for i, text in enumerate(texts):
+            if not text or text.isspace():
+                continue
+            cached = self._translation_cache.get((text, source_lang, target_lang))
+            if cached is not None:
+                self._cache_hits += 1
+                results[i] = cached["translated_text"]
+            else:
+                self._cache_misses += 1
+                misses.append(i)
+        
+        azure_source = self.language_map.get(source_lang, source_lang)
+        azure_target = self.language_map.get(target_lang, target_lang)
+        
+        # Split the misses into chunks that fit one Azure request each
+        chunks = []
+        chunk, chunk_chars = [], 0
+        for i in misses:
+            size = len(texts[i])
+            if chunk and (len(chunk) == AZURE_MAX_BATCH_TEXTS or chunk_chars + size > AZURE_MAX_BATCH_CHARS):
+                chunks.append(chunk)
+                chunk, chunk_chars = [], 0
+            chunk.append(i)
+            chunk_chars += size
+        if chunk:
+            chunks.append(chunk)
+        
+        for chunk in chunks:
+            translated = await self._translate_with_azure(
+                [texts[i] for i in chunk], 
+                azure_source, 
+                azure_target
+            )
+            # Failed requests leave the originals in place, uncached
+            if translated is None:
+                continue
+            for i, translated_text in zip(chunk, translated):
+                results[i] = translated_text
+                self._translation_cache[(texts[i], source_lang, target_lang)] = {
+                    "status": "success",
+                    "original_text": texts[i],
+                    "translated_text": translated_text,
+                    "source_lang": source_lang,
+                    "target_lang": target_lang
+                }
+        
+        logger.debug(
+            "✅ Batch translated: %s → %s (%d texts, %d sent to Azure)",
+            source_lang, target_lang, len(texts), len(misses)
+        )
+        
+        return results
+    
+    async def synthesize(self, text: str, language: str) -> str:
+        """
+        Speak already-translated text, base64 encoded for JSON payloads
+        
+        Args:
+            text: Text to speak
+            language: Language code of the text
+        
+        Returns:
+            Base64 encoded audio (or empty string if TTS unavailable/failed)
+        """
+        audio_bytes = await self.synthesize_audio(text, language)
+        return b64encode_as_string(audio_bytes) if audio_bytes else ""
+    
+    async def synthesize_audio(self, text: str, language: str) -> bytes:
+        """
+        Speak already-translated text (cached per text and language)
+        
+        Returns raw audio so binary transports can send it as is; callers
+        that need text encode it once, at the edge.
+        
+        Args:
+            text: Text to speak
+            language: Language code of the text
+        
+        Returns:
+            Raw audio bytes (or empty bytes if TTS unavailable/failed)
+        """
+        if not self.tts_enabled or not text or text.isspace():
+            return b""
+        
+        cache_key = (text, language)
+        audio_bytes = self._audio_cache.get(cache_key)
+        if audio_bytes is None:
+            audio_bytes = await self._text_to_speech(text, language)
+            # Failed TTS returns b"", which is worth retrying next time
+            if audio_bytes:
+                self._audio_cache[cache_key] = audio_bytes
+        
+        return audio_bytes
+    
     async def _translate_with_azure(
         self, 
-        text: str, 
+        texts: List[str], 
         source_lang: str, 
         target_lang: str
-    ) -> str:
+    ) -> Optional[List[str]]:
         """
-        Translate text using Azure Translator API
+        Translate texts using Azure Translator API (one request)
         
         Args:
-            text: Text to translate
+            texts: Texts to translate (within Azure's per-request limits)
             source_lang: Azure source language code
             target_lang: Azure target language code
         
         Returns:
-            Translated text
+            Translated texts in input order, or None if the request failed
         """
         
         if not self.azure_enabled:
-            return text
+            return list(texts)
         
         try:
-            # Azure Translator API endpoint
-            path = '/translate'
-            constructed_url = self.azure_endpoint + path
-            
             # Request parameters
             params = {
                 'api-version': '3.0',
@@ -208,116 +517,206 @@ class TranslationPipeline:
                 'to': target_lang
             }
             
-            # Request headers
-            headers = {
-                'Ocp-Apim-Subscription-Key': self.azure_key,
-                'Ocp-Apim-Subscription-Region': self.azure_region,
-                'Content-type': 'application/json',
-            }
-            
             # Request body
-            body = [{
-                'text': text
-            }]
+            body = [{'text': text} for text in texts]
             
             # Make request
-            response = requests.post(
-                constructed_url, 
-                params=params, 
-                headers=headers, 
-                json=body,
-                timeout=10
+            response = await self._http.post(
+                self._azure_url,
+                params=params,
+                json=body
             )
             
             response.raise_for_status()
             
             # Parse response
             result = response.json()
-            translated_text = result[0]['translations'][0]['text']
-            
-            return translated_text
+            return [item['translations'][0]['text'] for item in result]
         
-        except requests.exceptions.Timeout:
-            print(f"❌ Azure Translator timeout")
-            return text
+        except httpx.TimeoutException:
+            logger.error("❌ Azure Translator timeout")
+            return None
         
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Azure Translator error: {e}")
-            return text
+        except httpx.HTTPError as e:
+            logger.error("❌ Azure Translator error: %s", e)
+            return None
         
         except (KeyError, IndexError) as e:
-            print(f"❌ Error parsing Azure response: {e}")
-            return text
+            logger.error("❌ Error parsing Azure response: %s", e)
+            return None
     
-    async def _text_to_speech(self, text: str, language: str) -> str:
+    def _load_piper_voices(self, voices_dir: Optional[str]) -> Dict:
         """
-        Convert text to speech using gTTS (optional)
+        Load a Piper voice for every supported language that has one
+        
+        Voices are looked up as <voices_dir>/<language>.onnx (with the
+        matching .onnx.json config next to it), e.g. en.onnx, es.onnx.
+        
+        Args:
+            voices_dir: Directory holding the voice models (None to skip)
+        
+        Returns:
+            dict of language code -> loaded PiperVoice
+        """
+        if not voices_dir:
+            return {}
+        if not PIPER_AVAILABLE:
+            logger.warning("⚠️  piper-tts not available - PIPER_VOICES_DIR ignored, using gTTS")
+            return {}
+        
+        voices = {}
+        for language in self.language_map:
+            model_path = os.path.join(voices_dir, f"{language}.onnx")
+            if not os.path.exists(model_path):
+                continue
+            try:
+                voices[language] = PiperVoice.load(model_path)
+            except Exception as e:
+                logger.error("❌ Failed to load Piper voice %s: %s", model_path, e)
+        
+        logger.info("✅ Piper TTS voices loaded: %s", ', '.join(voices) or 'none')
+        return voices
+    
+    async def _text_to_speech(self, text: str, language: str) -> bytes:
+        """
+        Convert text to speech (optional)
+        
+        Uses the local Piper voice for the language when one is loaded
+        (WAV), otherwise gTTS (MP3).
         
         Args:
             text: Text to convert
             language: Language code
         
         Returns:
-            Base64 encoded audio (or empty string if TTS unavailable)
+            Raw audio bytes (or empty bytes if TTS unavailable/failed)
         """
         
-        if not TTS_AVAILABLE:
-            return ""
+        voice = self._piper_voices.get(language)
+        if voice is None and not TTS_AVAILABLE:
+            return b""
         
         try:
-            # Map to gTTS language code
-            tts_lang_map = {
-                "zh": "zh-CN",
-                "zh-Hans": "zh-CN",
-                "en": "en",
-                "es": "es",
-                "fr": "fr",
-                "de": "de",
-                "ja": "ja",
-                "ko": "ko",
-                "pt": "pt",
-                "it": "it",
-                "ru": "ru",
-                "ar": "ar",
-                "hi": "hi",
-                "tr": "tr",
-                "nl": "nl",
-                "pl": "pl",
-                "vi": "vi",
-                "th": "th",
-                "fa": "fa",
-            }
-            
-            tts_lang = tts_lang_map.get(language, "en")
-            
-            # Generate speech
-            tts = gTTS(text=text, lang=tts_lang, slow=False)
-            
-            # Save to bytes buffer
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            
-            # Convert to base64
-            audio_base64 = base64.b64encode(audio_buffer.read()).decode('utf-8')
-            
-            return audio_base64
+            # gTTS does blocking HTTP and Piper CPU-bound inference, so on the worker pool
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._speak, text, language, voice
+            )
         
         except Exception as e:
-            print(f"❌ TTS error: {e}")
-            return ""
+            logger.error("❌ TTS error: %s", e)
+            return b""
     
-    def get_supported_languages(self) -> Dict:
-        """Get list of supported languages"""
+    def _speak(self, text: str, language: str, voice) -> bytes:
+        """
+        Synthesize speech, through the disk cache when enabled (worker thread only)
+        
+        Args:
+            text: Text to speak
+            language: Language code of the text
+            voice: Piper voice for the language, or None to use gTTS
+        
+        Returns:
+            Raw audio bytes (WAV from Piper, MP3 from gTTS)
+        """
+        if voice is not None:
+            engine = f"piper|{language}"
+        else:
+            tts_lang = TTS_LANGUAGE_MAP.get(language, "en")
+            engine = f"gtts|{tts_lang}"
+        
+        cache_key = None
+        if self._disk_audio_cache is not None:
+            cache_key = hashlib.sha256(f"{engine}|{text}".encode()).digest()
+            audio_bytes = self._disk_audio_cache.get(cache_key)
+            if audio_bytes is not None:
+                return audio_bytes
+        
+        if voice is not None:
+            audio_bytes = self._synthesize_piper(voice, text)
+        else:
+            audio_bytes = self._synthesize(text, tts_lang)
+        
+        if cache_key is not None:
+            self._disk_audio_cache.set(cache_key, audio_bytes)
+        
+        return audio_bytes
+    
+    @staticmethod
+    def _synthesize_piper(voice, text: str) -> bytes:
+        """Run a Piper voice synchronously and return the WAV bytes (worker thread only)"""
+        audio_buffer = io.BytesIO()
+        with wave.open(audio_buffer, "wb") as wav_file:
+            voice.synthesize(text, wav_file)
+        
+        return audio_buffer.getvalue()
+    
+    @staticmethod
+    def _synthesize(text: str, tts_lang: str) -> bytes:
+        """Run gTTS synchronously and return the MP3 bytes (worker thread only)"""
+        tts = gTTS(text=text, lang=tts_lang, slow=False)
+        
+        # Save to bytes buffer
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        
+        return audio_buffer.getvalue()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get translation cache size and hit/miss counters"""
+        lookups = self._cache_hits + self._cache_misses
         return {
-            "mode": "bidirectional",
-            "azure_enabled": self.azure_enabled,
-            "tts_enabled": TTS_AVAILABLE,
-            "total_languages": len(self.supported_languages),
-            "languages": list(self.language_map.keys()),
-            "language_names": self.supported_languages
+            "size": len(self._translation_cache),
+            "max_size": self._translation_cache.maxsize,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": round(self._cache_hits / lookups, 3) if lookups else 0.0
         }
     
+    async def warmup(self):
+        """
+        Pay the backends' first-call costs before the first chat message
+        
+        Opens the pooled Azure connection (DNS + TLS) and runs each Piper
+        voice once (ONNX session setup). gTTS opens a fresh connection per
+        call, so there is nothing to warm there. Results aren't cached and
+        failures are only logged.
+        """
+        warmed = []
+        
+        if self.azure_enabled:
+            try:
+                translated = await self._translate_with_azure(["hello"], "en", "es")
+            except Exception as e:
+                translated = None
+                logger.error("❌ Azure warmup error: %s", e)
+            if translated is None:
+                logger.warning("⚠️  Azure warmup failed - first translation pays the connection setup")
+            else:
+                warmed.append("Azure")
+        
+        loop = asyncio.get_running_loop()
+        for language, voice in self._piper_voices.items():
+            try:
+                await loop.run_in_executor(self._executor, self._synthesize_piper, voice, "hello")
+                warmed.append(f"Piper ({language})")
+            except Exception as e:
+                logger.error("❌ Piper warmup failed (%s): %s", language, e)
+        
+        if warmed:
+            logger.info("🔥 Warmed up: %s", ", ".join(warmed))
+    
+    async def aclose(self):
+        """Close the Azure client, worker pool and disk cache (call on application shutdown)"""
+        if self._http is not None:
+            await self._http.aclose()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._disk_audio_cache is not None:
+            self._disk_audio_cache.close()
+    
+    def get_supported_languages(self) -> Dict:
+        """Get list of supported languages (shared dict built at init, don't mutate)"""
+        return self._languages_payload
+    
     def validate_language(self, language: str) -> bool:
         """
         Check if a language code is supported
@@ -328,7 +727,7 @@ class TranslationPipeline:
         Returns:
             True if supported, False otherwise
         """
-        return language in self.language_map
+        return language in self.language_codes
     
     def get_language_info(self, language: str) -> Optional[Dict]:
         """
@@ -338,31 +737,25 @@ class TranslationPipeline:
             language: Language code
             
         Returns:
-            Dict with language info or None if not supported
+            Dict with language info (shared, don't mutate) or None if not supported
         """
-        if not self.validate_language(language):
-            return None
-        
-        azure_code = self.language_map.get(language, language)
-        
-        return {
-            "code": language,
-            "azure_code": azure_code,
-            "name": self.supported_languages.get(azure_code, "Unknown"),
-            "supported": True
-        }
+        return self._language_info.get(language)
     
     async def process_audio_chunk(
         self, 
-        audio_data: str, 
+        audio_data: bytes, 
         source_lang: str, 
         target_lang: str
     ) -> Dict:
         """
         Process audio chunk (placeholder for future voice support)
         
+        Callers should decode the client's base64 payload once per message
+        and pass the same bytes for every target, so transcription can run
+        once per chunk instead of once per listener.
+        
         Args:
-            audio_data: Base64 encoded audio
+            audio_data: Raw (already decoded) audio bytes
             source_lang: Source language code
             target_lang: Target language code
         